@@ -1,4 +1,4 @@
-from . import backend, buffer, compile, key, prickle, validate
+from . import backend, buffer, compile, key, params, prickle, validate
 from .buffer import sync
 from .compile import clear_cache
 from .operators import *
@@ -17,7 +17,7 @@ def reduce():
     from .prickle import LoopPar
     return LoopPar().reduce()
 
-def convert_python_function_to_ir(fn):
+def parse_python_function(fn):
     import ast as python_ast
     import builtins
     import inspect
@@ -36,13 +36,18 @@ def convert_python_function_to_ir(fn):
 
     # Parse the Python AST
     ast = python_ast.parse(src)
+    return ast, filepath, fst_line, col_ofs
 
+def convert_python_ast_to_ir(ast, filepath, fst_line, col_ofs):
     # Convert the Python representation of the AST to a Python-like
     # representation in the compiler. As part of this step, we inline any
     # references to previously parsed functions.
     ir_ast_map = {k.__name__: v for k, v in ir_asts.items()}
     return prickle.python_to_ir(ast, filepath, fst_line-1, col_ofs, ir_ast_map)
 
+def convert_python_function_to_ir(fn):
+    return convert_python_ast_to_ir(*parse_python_function(fn))
+
 def check_kwarg(kwargs, key, default_value, expected_ty):
     if key not in kwargs or kwargs[key] is None:
         return default_value
@@ -65,18 +70,18 @@ def check_kwargs(kwargs):
 
     return opts
 
-def compile_function(ir_ast, args, opts):
-    # Extract the name of the main function in the IR AST.
-    name = prickle.get_ir_function_name(ir_ast)
-
+def compile_function(ir_ast, ir_key, args, opts):
     # Generate a key based on the IR AST, the function arguments, and the
     # compile options. If this key is found in the cache, we have already
     # compiled the function in this way before, so we return the cached wrapper
     # function.
-    fast_cache_key = key.generate_fast_cache_key(ir_ast, args, opts)
+    fast_cache_key = key.generate_fast_cache_key(ir_key, args, opts)
     if fast_cache_key in fun_cache:
         return fun_cache[fast_cache_key]
 
+    # Extract the name of the main function in the IR AST.
+    name = prickle.get_ir_function_name(ir_ast)
+
     # Generate the code based on the provided IR AST, arguments and compilation
     # options.
     ir_ast_map = {k.__name__: v for k, v in ir_asts.items()}
@@ -135,17 +140,24 @@ def jit(fun):
     time the function is used, the IR AST is JIT compiled based on the types of
     the provided arguments.
     """
-    ir_ast = convert_python_function_to_ir(fun)
+    py_ast, filepath, fst_line, col_ofs = parse_python_function(fun)
+    ir_ast = convert_python_ast_to_ir(py_ast, filepath, fst_line, col_ofs)
+    ir_key = key.print_ir_ast_key(ir_ast)
+
+    # Determine which parameters are never written to by the function, so that
+    # we can avoid copying their data back after running the function.
+    jit_names = {k.__name__ for k in ir_asts.keys()}
+    read_only = params.find_read_only_params(py_ast, jit_names)
 
     def inner(*args, **kwargs):
         opts = backend.resolve(check_kwargs(kwargs), True)
-        callbacks, args = validate.check_arguments(args, opts, True)
+        callbacks, args = validate.check_arguments(args, opts, True, read_only)
         # If the user explicitly requests sequential execution by setting the 'seq'
         # keyword argument to True, we call the original Python function.
         if opts.seq:
             fun(*args)
         else:
-            compile_function(ir_ast, args, opts)(*args)
+            compile_function(ir_ast, ir_key, args, opts)(*args)
         run_callbacks(callbacks, opts)
     ir_asts[inner] = ir_ast
     inner.__name__ = fun.__name__
@@ -176,6 +176,18 @@ def check_array_interface(intf):
 
     return shape, dtype, data
 
+# Returns the (CPU) array interface of the provided argument, or None if it does
+# not expose one. We use getattr with a default value rather than hasattr, as
+# the latter would require looking up the attribute a second time.
+def get_array_interface(t):
+    intf = getattr(t, "__array_interface__", None)
+    if intf is not None:
+        return intf
+    to_array = getattr(t, "__array__", None)
+    if to_array is not None:
+        return to_array().__array_interface__
+    return None
+
 def to_array_interface(ptr, dtype, shape):
     return {
         'data': (ptr, False),
@@ -196,12 +208,21 @@ def sync(backend):
         raise RuntimeError(f"Called sync on unsupported compiler backend {backend}")
 
 class Buffer:
-    def __init__(self, buf, shape, dtype, backend=None, src_ptr=None):
+    def __init__(self, buf, shape, dtype, backend=None, src_ptr=None, owner=None, host_mapped=False, read_only=False):
         self.buf = buf
         self.shape = shape
         self.dtype = dtype
         self.backend = backend
         self.src_ptr = src_ptr
+        self.host_mapped = host_mapped
+
+        # If the data of a buffer is only read from, we do not need to copy it
+        # back to the source pointer when cleaning up.
+        self.read_only = read_only
+
+        # When the buffer is a view of data owned by another object, we keep a
+        # reference to that object to ensure the data outlives the buffer.
+        self.owner = owner
 
         if self.backend is None:
             arr_intf = to_array_interface(self.buf, self.dtype, self.shape)
@@ -248,7 +269,9 @@ class Buffer:
     def sync(self):
         sync(self.backend)
 
-    def cleanup(self):
+    # If the caller has already synchronized with the backend, it can set
+    # 'synchronized' to avoid having the buffer synchronize again.
+    def cleanup(self, synchronized=False):
         nbytes = reduce(mul, self.shape, 1) * self.dtype.size()
         if self.backend == CompileBackend.Cuda:
             try:
@@ -257,78 +280,134 @@ class Buffer:
                 # If we cannot import the library the program is about to quit.
                 # In this case, the memory will be deallocated on exit anyway.
                 return
-            if self.src_ptr is not None:
-                check_cuda_errors(runtime.cudaMemcpyAsync(self.src_ptr, self.buf, nbytes, runtime.cudaMemcpyKind.cudaMemcpyDeviceToHost, 0))
+            if self.host_mapped:
+                # The data was accessed directly from host memory, so we only
+                # need to unregister it.
+                check_cuda_errors(runtime.cudaHostUnregister(self.src_ptr))
+                self.buf = None
+            elif self.src_ptr is not None:
+                if not self.read_only:
+                    check_cuda_errors(runtime.cudaMemcpyAsync(self.src_ptr, self.buf, nbytes, runtime.cudaMemcpyKind.cudaMemcpyDeviceToHost, 0))
                 check_cuda_errors(runtime.cudaFreeAsync(self.buf, 0))
                 self.buf = None
         elif self.backend == CompileBackend.Metal:
             if self.buf is not None:
                 # Need to wait for kernels to complete before we copy data.
-                self.sync()
-                if self.src_ptr is not None:
+                if not synchronized:
+                    self.sync()
+                if self.src_ptr is not None and not self.read_only:
                     metal_lib.prickle_memcpy(self.src_ptr, self.ptr, nbytes)
                 metal_lib.prickle_free_buffer(self.buf)
                 self.ptr = None
                 self.buf = None
 
-    def from_array_cpu(t):
+    def batch_cleanup(bufs):
+        # Cleans up all provided buffers without synchronizing for each buffer.
+        # The caller must synchronize with the backend before calling this.
+        for buf in bufs:
+            buf.cleanup(True)
+
+    def from_array_cpu(t, intf=None):
         # For the dummy backend, we just need any pointer to construct the
         # Buffer, so we use a CUDA pointer if this is available to ensure no
         # copying is performed (this Buffer is only used for validation
         # purposes, it should never be dereferenced).
-        if hasattr(t, "__cuda_array_interface__"):
-            shape, dtype, data_ptr = check_array_interface(t.__cuda_array_interface__)
-        elif hasattr(t, "__array_interface__"):
-            shape, dtype, data_ptr = check_array_interface(t.__array_interface__)
-        elif hasattr(t, "__array__"):
-            shape, dtype, data_ptr = check_array_interface(t.__array__().__array_interface__)
-        else:
+        if intf is None:
+            intf = getattr(t, "__cuda_array_interface__", None)
+        if intf is None:
+            intf = get_array_interface(t)
+        if intf is None:
             raise RuntimeError(f"Cannot convert argument {t} to CPU buffer")
 
-        return Buffer(data_ptr, shape, dtype)
-
-    def from_array_cuda(t):
+        shape, dtype, data_ptr = check_array_interface(intf)
+        return Buffer(data_ptr, shape, dtype, owner=t)
+
+    def from_cuda_array_interface(intf, owner=None):
+        # The data described by the CUDA array interface is already allocated
+        # on the GPU, so we construct the buffer without copying any data.
+        #
+        # NOTE: We ignore the 'stream' entry of the interface, even though
+        # version 3 of the interface requires consumers to synchronize on it.
+        # The generated code runs on the legacy default stream, which does not
+        # wait for work on non-blocking streams (such as Torch side streams).
+        # Producers using such streams must synchronize before passing the
+        # data to a Prickle function.
+        shape, dtype, data_ptr = check_array_interface(intf)
+        return Buffer(data_ptr, shape, dtype, CompileBackend.Cuda, owner=owner)
+
+    def from_array_cuda(t, intf=None, read_only=False):
         # If the provided argument defines the __cuda_array_interface__, we can
         # construct the buffer without copying data. Otherwise, we allocate a
         # new buffer based on the provided data.
-        if hasattr(t, "__cuda_array_interface__"):
-            shape, dtype, data_ptr = check_array_interface(t.__cuda_array_interface__)
-            return Buffer(data_ptr, shape, dtype, CompileBackend.Cuda)
-        elif hasattr(t, "__array_interface__"):
-            shape, dtype, data_ptr = check_array_interface(t.__array_interface__)
-        elif hasattr(t, "__array__"):
-            shape, dtype, data_ptr = check_array_interface(t.__array__().__array_interface__)
-        else:
+        if intf is None:
+            cuda_intf = getattr(t, "__cuda_array_interface__", None)
+            if cuda_intf is not None:
+                return Buffer.from_cuda_array_interface(cuda_intf, t)
+            intf = get_array_interface(t)
+        if intf is None:
             raise RuntimeError(f"Cannot convert argument {t} to CUDA buffer")
 
+        shape, dtype, data_ptr = check_array_interface(intf)
         from cuda.bindings import runtime
         nbytes = reduce(mul, shape, 1) * dtype.size()
         [ptr] = check_cuda_errors(runtime.cudaMallocAsync(nbytes, 0))
         check_cuda_errors(runtime.cudaMemcpyAsync(ptr, data_ptr, nbytes, runtime.cudaMemcpyKind.cudaMemcpyHostToDevice, 0))
-        return Buffer(ptr, shape, dtype, CompileBackend.Cuda, data_ptr)
+        return Buffer(ptr, shape, dtype, CompileBackend.Cuda, data_ptr, read_only=read_only)
+
+    def from_array_cuda_mapped(t, intf=None, read_only=False):
+        # Page-lock the memory of the provided host array and map it into the
+        # address space of the GPU, so that kernels can access the data without
+        # it being copied to a separate buffer.
+        if intf is None:
+            intf = get_array_interface(t)
+        if intf is None:
+            raise RuntimeError(f"Cannot convert argument {t} to mapped CUDA buffer")
+
+        shape, dtype, data_ptr = check_array_interface(intf)
+        from cuda.bindings import runtime
+        nbytes = reduce(mul, shape, 1) * dtype.size()
 
-    def from_array_metal(t):
-        if hasattr(t, "__array_interface__"):
-            shape, dtype, data_ptr = check_array_interface(t.__array_interface__)
-        elif hasattr(t, "__array__"):
-            shape, dtype, data_ptr = check_array_interface(t.__array__().__array_interface__)
-        else:
+        # Empty arrays cannot be registered, so we allocate a regular buffer.
+        if nbytes == 0:
+            return Buffer.from_array_cuda(t, intf, read_only)
+
+        # If the registration fails, we clear the error and copy the data to a
+        # regular buffer instead. For instance, this happens when the array
+        # shares a page with memory that is already registered (as CUDA
+        # registers memory by whole pages), when passing the same array twice,
+        # or on platforms that do not support registering host memory.
+        [err] = runtime.cudaHostRegister(data_ptr, nbytes, runtime.cudaHostRegisterMapped)
+        if err != runtime.cudaError_t.cudaSuccess:
+            runtime.cudaGetLastError()
+            return Buffer.from_array_cuda(t, intf, read_only)
+        [ptr] = check_cuda_errors(runtime.cudaHostGetDevicePointer(data_ptr, 0))
+        return Buffer(ptr, shape, dtype, CompileBackend.Cuda, data_ptr, owner=t, host_mapped=True)
+
+    def from_array_metal(t, intf=None, read_only=False):
+        if intf is None:
+            intf = get_array_interface(t)
+        if intf is None:
             raise RuntimeError(f"Cannot convert argument {t} to Metal buffer")
 
+        shape, dtype, data_ptr = check_array_interface(intf)
         try_load_metal_base_lib()
         nbytes = reduce(mul, shape, 1) * dtype.size()
         buf = metal_lib.prickle_alloc_buffer(nbytes)
         ptr = metal_lib.prickle_ptr_buffer(buf)
         metal_lib.prickle_memcpy(ptr, data_ptr, nbytes)
-        return Buffer(buf, shape, dtype, CompileBackend.Metal, data_ptr)
+        return Buffer(buf, shape, dtype, CompileBackend.Metal, data_ptr, read_only=read_only)
 
-    def from_array(t, backend=None):
+    # If the (CPU) array interface of the argument has already been looked up,
+    # it can be provided via 'intf' to avoid looking it up again. When
+    # 'read_only' is set, the data is not copied back to the argument when the
+    # buffer is cleaned up.
+    def from_array(t, backend=None, intf=None, read_only=False):
         if backend is None:
-            return Buffer.from_array_cpu(t)
+            return Buffer.from_array_cpu(t, intf)
         if backend == CompileBackend.Cuda:
-            return Buffer.from_array_cuda(t)
+            return Buffer.from_array_cuda(t, intf, read_only)
         elif backend == CompileBackend.Metal:
-            return Buffer.from_array_metal(t)
+            return Buffer.from_array_metal(t, intf, read_only)
         else:
             raise RuntimeError(f"Unsupported buffer backend {backend}")
 
@@ -112,11 +112,14 @@ def get_wrapper(name, key, opts):
 
     # Expand arguments such that each value stored in a dictionary is passed as a
     # separate argument.
-    def expand_arg(arg):
-        if isinstance(arg, dict):
-            return [v for (_, v) in sorted(arg.items())]
-        else:
-            return [arg]
+    def expand_args(args):
+        exp_args = []
+        for arg in args:
+            if isinstance(arg, dict):
+                exp_args.extend(v for (_, v) in sorted(arg.items()))
+            else:
+                exp_args.append(arg)
+        return exp_args
 
     # Return the ctypes type of an argument.
     def get_ctype(arg):
@@ -142,11 +145,15 @@ def get_wrapper(name, key, opts):
         else:
             return arg
 
+    # The types of the arguments are the same every time we call a particular
+    # wrapper function, as they are part of the key used to cache it. Therefore,
+    # we only compute the ctypes types of the arguments in the first call.
+    fn = getattr(lib, name)
     def wrapper(*args):
-        if any([isinstance(arg, dict) for arg in args]):
-            exp_args = [expand_arg(a) for a in args]
-            args = [x for xs in exp_args for x in xs]
-        getattr(lib, name).argtypes = [get_ctype(arg) for arg in args]
-        getattr(lib, name)(*[value_or_ptr(arg) for arg in args])
+        if any(isinstance(arg, dict) for arg in args):
+            args = expand_args(args)
+        if fn.argtypes is None:
+            fn.argtypes = [get_ctype(arg) for arg in args]
+        fn(*[value_or_ptr(arg) for arg in args])
     wrapper.__name__ = name
     return wrapper
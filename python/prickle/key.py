@@ -29,9 +29,13 @@ def print_arguments_key(args):
 def print_compile_options_key(opts):
     return str(opts)
 
-def generate_fast_cache_key(ir_ast, args, opts):
+def print_ir_ast_key(ir_ast):
     from .prickle import print_ir_ast
-    ir_key = print_ir_ast(ir_ast)
+    return print_ir_ast(ir_ast)
+
+# The IR AST of a function does not change after it has been parsed, so the
+# caller computes its key once (using 'print_ir_ast_key') and passes it here.
+def generate_fast_cache_key(ir_key, args, opts):
     args_key = print_arguments_key(args)
     opts_key = print_compile_options_key(opts)
     return f"{ir_key}+{args_key}+{opts_key}"
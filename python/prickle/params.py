@@ -0,0 +1,58 @@
+import ast as python_ast
+import builtins
+
+# Finds the root variable of a chain of subscripts, such as 'x' in 'x["a"][i]'.
+# Returns None if the root of the chain is not a variable.
+def subscript_root(e):
+    while isinstance(e, python_ast.Subscript):
+        e = e.value
+    if isinstance(e, python_ast.Name):
+        return e.id
+    return None
+
+# Determines whether reading a subscript of a parameter in the given context
+# may result in the parameter being written to. This is the case when the value
+# is bound to a variable, which may then alias the parameter, or when it is
+# passed to a function other than a built-in or a Prickle operator. As a jitted
+# function may shadow a built-in, we consider calls to any of the provided
+# names of jitted functions to write to their arguments.
+def may_alias(parent, e, jit_names):
+    if isinstance(parent, python_ast.Assign):
+        return any(not isinstance(t, python_ast.Subscript) for t in parent.targets)
+    elif isinstance(parent, (python_ast.AnnAssign, python_ast.NamedExpr)):
+        return True
+    elif isinstance(parent, python_ast.Call) and e is not parent.func:
+        f = parent.func
+        if isinstance(f, python_ast.Attribute):
+            return subscript_root(f.value) != "prickle"
+        elif isinstance(f, python_ast.Name):
+            return f.id in jit_names or not hasattr(builtins, f.id)
+        return True
+    return False
+
+# Returns a list containing a boolean for each parameter of the function defined
+# in the provided Python AST, stating whether the parameter is only read from.
+# The analysis is conservative - a parameter is considered to be written to
+# unless it is only used as the root of a subscript which is read from.
+def find_read_only_params(py_ast, jit_names):
+    fun_def = py_ast.body[0]
+    params = [arg.arg for arg in fun_def.args.args]
+
+    parents = {}
+    for node in python_ast.walk(fun_def):
+        for child in python_ast.iter_child_nodes(node):
+            parents[child] = node
+
+    written = set()
+    for node in python_ast.walk(fun_def):
+        if isinstance(node, python_ast.Name) and node.id in params:
+            # Find the outermost subscript of which the parameter is the root.
+            e = node
+            while isinstance(parents[e], python_ast.Subscript) and parents[e].value is e:
+                e = parents[e]
+            if e is node:
+                written.add(node.id)
+            elif not isinstance(e.ctx, python_ast.Load) or may_alias(parents[e], e, jit_names):
+                written.add(node.id)
+
+    return [p not in written for p in params]
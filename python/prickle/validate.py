@@ -1,61 +1,99 @@
 from .prickle import CompileBackend
-from .buffer import Buffer
+from .buffer import Buffer, get_array_interface
 import numpy as np
 
-def check_dict(arg, i, in_dict, opts, execute):
+# The array interface specifies that the strides are omitted or set to None
+# when the data is laid out contiguously in memory (in row-major order).
+def check_contiguous(intf, i):
+    if intf.get("strides") is not None:
+        raise RuntimeError(f"Argument {i} is not contiguous in memory, which is " +
+                            "required for arrays passed to parallel code.")
+
+def check_dict(arg, i, in_dict, opts, execute, read_only):
     if in_dict:
         raise RuntimeError(f"Dictionary argument {i} contains nested dictionary")
-    callbacks = []
+    bufs = []
     arg_res = {}
     for k, v in arg.items():
         if not isinstance(k, str):
             raise RuntimeError(f"Dictionary argument {i} contains non-string key {k}")
-        cbs, v_arg = check_arg(v, f"{i}[\"{k}\"]", True, opts, execute)
-        callbacks += cbs
+        v_bufs, v_arg = check_arg(v, f"{i}[\"{k}\"]", True, opts, execute, read_only)
+        bufs += v_bufs
         arg_res[k] = v_arg
-    return callbacks, arg_res
+    return bufs, arg_res
 
-def check_arg(arg, i, in_dict, opts, execute):
-    if isinstance(arg, int) or isinstance(arg, float):
+def check_arg(arg, i, in_dict, opts, execute, read_only):
+    if isinstance(arg, (int, float)):
         return [], arg
     elif isinstance(arg, dict):
-        return check_dict(arg, i, in_dict, opts, execute)
+        return check_dict(arg, i, in_dict, opts, execute, read_only)
     elif isinstance(arg, Buffer):
         if execute and opts.seq:
             return [], arg.numpy()
         else:
             return [], arg
-    elif hasattr(arg, "__cuda_array_interface__"):
+
+    # We look up the CUDA array interface once and pass it on to the buffer
+    # constructor, to avoid probing the argument for it multiple times.
+    cuda_intf = getattr(arg, "__cuda_array_interface__", None)
+    if cuda_intf is not None:
         if opts.backend == CompileBackend.Cuda:
             if opts.seq:
                 raise RuntimeError(f"Argument {i} is a CUDA array, which cannot " +
                                     "be used in sequential execution.")
-            return [], Buffer.from_array(arg, CompileBackend.Cuda)
+            check_contiguous(cuda_intf, i)
+            return [], Buffer.from_cuda_array_interface(cuda_intf, arg)
         else:
             raise RuntimeError(f"Argument {i} is a CUDA array, which is not "
                                 "supported in {opts.backend}.")
-    elif hasattr(arg, "__array_interface__") or hasattr(arg, "__array__"):
+
+    intf = get_array_interface(arg)
+    if intf is not None:
+        if execute and opts.seq:
+            return [], np.asarray(arg)
+
+        # We validate that the data is contiguous before constructing a buffer,
+        # to avoid allocating memory for data we cannot use.
+        check_contiguous(intf, i)
+
         # Copy data to memory accessible from the GPU. If the resulting code
         # will not be executed, we do not copy data so we can generate code for
-        # a backend even if it is not available.
+        # a backend even if it is not available. The resulting buffer only
+        # refers to the original data, so it does not need to be cleaned up.
         if not execute:
-            buf = Buffer.from_array(arg)
-        elif opts.seq:
-            return [], np.asarray(arg)
+            return [], Buffer.from_array(arg, None, intf)
+        elif opts.backend == CompileBackend.Cuda and opts.cuda_host_mapped:
+            buf = Buffer.from_array_cuda_mapped(arg, intf, read_only)
         else:
-            buf = Buffer.from_array(arg, opts.backend)
-        callback = lambda: buf.cleanup()
-        return [callback], buf
+            buf = Buffer.from_array(arg, opts.backend, intf, read_only)
+        return [buf], buf
+
+    # If the argument only supports the DLPack protocol, we convert it to a
+    # Torch tensor sharing the same memory. This tensor exposes one of the
+    # array interfaces above, depending on which device the data resides on.
+    if hasattr(arg, "__dlpack__"):
+        import torch
+        return check_arg(torch.from_dlpack(arg), i, in_dict, opts, execute, read_only)
+
+    raise RuntimeError(f"Argument {i} has unsupported type {type(arg)}")
 
 # Validate all arguments, ensuring that they have a supported type and that
 # all tensor data is contiguous and allocated on the GPU. At the same time, we
 # convert data types. When converting to temporary buffers that require
-# copying, we also include callback functions which are invoked after the
-# kernel to ensure data is copied back.
-def check_arguments(args, opts, execute):
-    callbacks, args_res = [], []
+# copying, we also include a callback function which is invoked after the
+# kernel, after synchronizing with the GPU, to ensure data is copied back. This
+# callback cleans up all temporary buffers at once, without synchronizing again
+# for each buffer. If provided, the 'read_only' list states which arguments the
+# function never writes to, in which case we do not need to copy their data
+# back.
+def check_arguments(args, opts, execute, read_only=()):
+    bufs, args_res = [], []
     for i, arg in enumerate(args):
-        cbs, arg = check_arg(arg, f"#{i+1}", False, opts, execute)
-        callbacks += cbs
+        arg_read_only = i < len(read_only) and read_only[i]
+        arg_bufs, arg = check_arg(arg, f"#{i+1}", False, opts, execute, arg_read_only)
+        bufs += arg_bufs
         args_res.append(arg)
-    return callbacks, args_res
+    if len(bufs) > 0:
+        return [lambda: Buffer.batch_cleanup(bufs)], args_res
+    else:
+        return [], args_res
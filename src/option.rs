@@ -32,6 +32,13 @@ pub struct CompileOptions {
     #[pyo3(get, set)]
     pub verbose_backend_resolution: bool,
 
+    // When enabled, host arrays passed to a function running on the CUDA backend are page-locked
+    // and mapped into the address space of the GPU, instead of being copied to a temporary buffer
+    // on the GPU. This avoids copying small arrays back and forth, but registering large arrays
+    // may be more expensive than copying them.
+    #[pyo3(get, set)]
+    pub cuda_host_mapped: bool,
+
     ///////////////////
     // CODEGEN FLAGS //
     ///////////////////
@@ -73,6 +80,7 @@ impl Default for CompileOptions {
             parallelize: BTreeMap::new(),
             seq: false,
             verbose_backend_resolution: false,
+            cuda_host_mapped: false,
             backend: CompileBackend::Auto,
             debug_print: false,
             debug_perf: false,
@@ -89,6 +89,21 @@ def prickle_min(dst, a, b):
     with prickle.gpu:
         dst[0] = prickle.min(a[0], b[0])
 
+# Equivalent to 'np.allclose' for arrays containing a single element, but
+# without the overhead of allocating intermediate arrays.
+def scalar_close(a, b, rtol=1e-5, atol=1e-5):
+    x, y = float(a[0]), float(b[0])
+    if math.isinf(x) or math.isinf(y):
+        return x == y
+    return x == y or abs(x - y) <= atol + rtol * abs(y)
+
+def test_scalar_close_infinity():
+    inf = np.array([math.inf])
+    assert scalar_close(inf, inf)
+    assert not scalar_close(np.array([1.0]), inf)
+    assert not scalar_close(inf, np.array([1.0]))
+    assert not scalar_close(-inf, inf)
+
 def arith_binop_dtype(fn, ldtype, rdtype, compile_only, backend):
     a = np.random.randint(1, 10, (1,)).astype(ldtype)
     b = np.random.randint(1, 10, (1,)).astype(rdtype)
@@ -100,7 +115,7 @@ def arith_binop_dtype(fn, ldtype, rdtype, compile_only, backend):
         dst_device = np.zeros_like(dst)
         fn(dst_device, a, b, opts=par_opts(backend, {}))
         fn(dst, a, b, opts=seq_opts(backend))
-        assert np.allclose(dst, dst_device, atol=1e-5)
+        assert scalar_close(dst, dst_device, atol=1e-5)
 
 bitwise_funs = [
     prickle_bit_and, prickle_bit_or, prickle_bit_xor, prickle_bit_shl, prickle_bit_shr
@@ -157,8 +172,19 @@ def set_expected_behavior_binop(fn, ldtype, rdtype, backend):
     else:
         return RunType.ShouldPass, None
 
+# Determine the expected behavior of all combinations of binary operations, types
+# and backends once, when the module is loaded. We key the backends by their
+# string representation, as the backend type is not guaranteed to be hashable.
+expected_binop_behavior = {
+    (fn, ldtype, rdtype, str(backend)): set_expected_behavior_binop(fn, ldtype, rdtype, backend)
+    for fn in arith_funs
+    for ldtype in arith_tys
+    for rdtype in arith_tys
+    for backend in compiler_backends
+}
+
 def bin_arith_helper(fn, ldtype, rdtype, compile_only, backend):
-    rt, msg_regex = set_expected_behavior_binop(fn, ldtype, rdtype, backend)
+    rt, msg_regex = expected_binop_behavior[(fn, ldtype, rdtype, str(backend))]
     if rt == RunType.ShouldPass:
         arith_binop_dtype(fn, ldtype, rdtype, compile_only, backend)
     elif rt == RunType.ShouldFail:
@@ -247,7 +273,7 @@ def arith_unop_dtype(fn, dtype, compile_only, backend):
         dst_device = np.zeros_like(dst)
         fn(dst_device, src, opts=par_opts(backend, {}))
         fn(dst, src, opts=seq_opts(backend))
-        assert np.allclose(dst, dst_device, atol=1e-5)
+        assert scalar_close(dst, dst_device, atol=1e-5)
 
 float_funs = [prickle_cos, prickle_sin, prickle_tanh, prickle_atan2, prickle_sqrt]
 float_tys = [np.float16, np.float32, np.float64]
@@ -33,6 +33,15 @@ def test_copy_compiles(backend):
     s = prickle.print_compiled(copy, [x, y], par_opts(backend, p))
     assert len(s) != 0
 
+@pytest.mark.parametrize('backend', compiler_backends)
+def test_copy_non_contiguous_rejected(backend):
+    x = torch.randn(10, 2, dtype=torch.float32)[:, 0]
+    y = torch.zeros(10, dtype=torch.float32)
+    p = {'i': prickle.threads(1024)}
+    with pytest.raises(RuntimeError) as e_info:
+        prickle.print_compiled(copy, [x, y], par_opts(backend, p))
+    assert e_info.match(r"Argument #1 is not contiguous.*")
+
 @pytest.mark.parametrize('backend', compiler_backends)
 def test_copy_run_compiled_string(backend):
     def helper():
@@ -44,3 +53,62 @@ def test_copy_run_compiled_string(backend):
         fn(x, y)
         assert torch.allclose(x, y)
     run_if_backend_is_enabled(backend, helper)
+
+def test_copy_cuda_host_mapped():
+    backend = prickle.CompileBackend.Cuda
+    def helper():
+        x = torch.randn(10, dtype=torch.float32)
+        p = {'i': prickle.threads(1024)}
+        opts = par_opts(backend, p)
+        opts.cuda_host_mapped = True
+        y = copy_wrap(x, opts)
+        assert torch.allclose(x, y)
+    run_if_backend_is_enabled(backend, helper)
+
+# Wraps a tensor such that it can only be accessed via the DLPack protocol.
+class DLPackTensor:
+    def __init__(self, t):
+        self.t = t
+
+    def __dlpack__(self, **kwargs):
+        return self.t.__dlpack__(**kwargs)
+
+    def __dlpack_device__(self):
+        return self.t.__dlpack_device__()
+
+@pytest.mark.parametrize('backend', compiler_backends)
+def test_copy_dlpack(backend):
+    def helper():
+        x = torch.randn(10, dtype=torch.float32)
+        y = torch.zeros_like(x)
+        p = {'i': prickle.threads(1024)}
+        copy(DLPackTensor(x), DLPackTensor(y), opts=par_opts(backend, p))
+        assert torch.allclose(x, y)
+    run_if_backend_is_enabled(backend, helper)
+
+def test_copy_cuda_host_mapped_same_array():
+    backend = prickle.CompileBackend.Cuda
+    def helper():
+        x = torch.randn(10, dtype=torch.float32)
+        expected = x.clone()
+        p = {'i': prickle.threads(1024)}
+        opts = par_opts(backend, p)
+        opts.cuda_host_mapped = True
+        copy(x, x, opts=opts)
+        assert torch.allclose(x, expected)
+    run_if_backend_is_enabled(backend, helper)
+
+def test_copy_cuda_host_mapped_small_arrays():
+    backend = prickle.CompileBackend.Cuda
+    def helper():
+        # Small arrays allocated after each other are likely to be stored on
+        # the same page of memory.
+        xs = [torch.randn(10, dtype=torch.float32) for _ in range(4)]
+        ys = [torch.zeros_like(x) for x in xs]
+        p = {'i': prickle.threads(1024)}
+        opts = par_opts(backend, p)
+        opts.cuda_host_mapped = True
+        for x, y in zip(xs, ys):
+            copy(x, y, opts=opts)
+            assert torch.allclose(x, y)
+    run_if_backend_is_enabled(backend, helper)
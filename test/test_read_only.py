@@ -0,0 +1,65 @@
+# Tests the analysis determining which parameters of a function are only read
+# from, which we use to avoid copying data back after running a function.
+
+import prickle
+import pytest
+
+from common import *
+
+def find_read_only_params(fn):
+    py_ast, _, _, _ = prickle.parse_python_function(fn)
+    jit_names = {k.__name__ for k in prickle.ir_asts.keys()}
+    return prickle.params.find_read_only_params(py_ast, jit_names)
+
+def test_read_only_copy():
+    def copy(x, y):
+        prickle.label('i')
+        y[:] = x[:]
+    assert find_read_only_params(copy) == [True, False]
+
+def test_read_only_aug_assign():
+    def normalize_rows(t, nrows, ncols):
+        prickle.label('i')
+        for i in range(nrows):
+            prickle.label('j1')
+            s = prickle.sum(t[i, :])
+
+            prickle.label('j2')
+            t[i, :] /= s
+    assert find_read_only_params(normalize_rows)[0] == False
+
+def test_read_only_dict():
+    def spmv(A, x, y):
+        prickle.label('row')
+        for row in range(A["nrows"]):
+            s = prickle.float32(0.0)
+            for i in range(A["rows"][row], A["rows"][row+1]):
+                s = s + A["values"][i] * x[A["cols"][i]]
+            y[row] = s
+    assert find_read_only_params(spmv) == [True, True, False]
+
+def test_read_only_alias():
+    def alias(x, y):
+        with prickle.gpu:
+            z = x[0]
+            y[0] = z
+    assert find_read_only_params(alias) == [False, False]
+
+def test_read_only_call():
+    def call(x, y):
+        with prickle.gpu:
+            y[0] = f(x[0])
+    assert find_read_only_params(call) == [False, False]
+
+def test_read_only_jit_call_shadowing_builtin():
+    @prickle.jit
+    def round(x, N):
+        prickle.label('j')
+        for j in range(N):
+            x[j] = x[j] + 1.0
+
+    def call(x, N, M):
+        prickle.label('i')
+        for i in range(N):
+            round(x[i], M)
+    assert find_read_only_params(call)[0] == False
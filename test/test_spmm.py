@@ -35,10 +35,14 @@ def spmm_wrap(A, B, target, opts):
 
 def uniform_random_csr_f32_i64(N, M, d):
     nnz = int(N * M * d)
-    s = set()
-    while len(s) < nnz:
-        s.update(np.random.randint(0, N*M, nnz - len(s)))
-    flat_idxs = np.array(list(s), dtype=np.int64)
+    # Oversample the indices so that we typically get enough unique indices in
+    # the first attempt. As 'np.unique' returns the indices in sorted order, we
+    # pick a random subset of them to keep the distribution uniform.
+    flat_idxs = np.unique(np.random.randint(0, N*M, int(nnz * 1.3)))
+    while len(flat_idxs) < nnz:
+        idxs = np.random.randint(0, N*M, nnz - len(flat_idxs))
+        flat_idxs = np.unique(np.concatenate((flat_idxs, idxs)))
+    flat_idxs = np.random.choice(flat_idxs, nnz, replace=False).astype(np.int64)
     rows, cols = np.divmod(flat_idxs, M)
     values = torch.randn(nnz, dtype=torch.float32)
     idxs = np.array((rows, cols))